@@ -2,8 +2,16 @@ import socket
 import ssl
 import configparser
 import logging
+import queue
+import threading
 import time
-from typing import Optional
+from typing import List, Optional, Union
+from protocol import (
+    CLOSING_RESPONSES,
+    ERROR_EMPTY_QUERY,
+    encode_message,
+    recv_message,
+)
 
 # Load configuration settings
 config = configparser.ConfigParser()
@@ -13,6 +21,7 @@ config.read("config.ini")
 HOST = config.get("Server", "host", fallback="localhost")
 PORT = config.getint("Server", "port", fallback=12345)
 SSL_ENABLED = config.getboolean("Server", "ssl_enabled", fallback=True)
+MAX_CONNECTIONS = config.getint("Client", "max_connections", fallback=50)
 
 # Set up logging to track client activity
 logging.basicConfig(
@@ -21,9 +30,34 @@ logging.basicConfig(
 logger = logging.getLogger()
 
 
+ClientSocket = Union[socket.socket, ssl.SSLSocket]
+
+# How long a caller waits for a pooled connection to be returned before
+# checking whether one was closed instead, freeing room for a new one
+POOL_WAIT = 0.1
+
+
+def create_ssl_context() -> ssl.SSLContext:
+    """
+    Create the SSL context used to connect to the server.
+
+    The server uses a self-signed certificate, so it is not verified.
+
+    :return: A client-side SSL context.
+    """
+    context = ssl.create_default_context()
+    context.check_hostname = False
+    context.verify_mode = ssl.CERT_NONE
+    return context
+
+
 class FileSearchClient:
     def __init__(
-        self, host: str = HOST, port: int = PORT, ssl_enabled: bool = SSL_ENABLED
+        self,
+        host: str = HOST,
+        port: int = PORT,
+        ssl_enabled: bool = SSL_ENABLED,
+        max_connections: int = MAX_CONNECTIONS,
     ):
         """
         Initialize the FileSearchClient.
@@ -31,23 +65,112 @@ class FileSearchClient:
         :param host: The server host.
         :param port: The server port.
         :param ssl_enabled: Whether to use SSL for the connection.
+        :param max_connections: Maximum number of connections open at once, in use or idle.
         """
         self.host = host
         self.port = port
         self.ssl_enabled = ssl_enabled
         self.ssl_context: Optional[ssl.SSLContext] = None
+        # Idle connections to the server, reused across queries to skip the TCP/TLS handshake
+        self._pool: "queue.Queue[ClientSocket]" = queue.Queue(maxsize=max_connections)
+        # One slot per open connection, whether in use or idle in the pool
+        self._slots = threading.BoundedSemaphore(max_connections)
 
     def setup_ssl(self) -> None:
         """Set up SSL context if SSL is enabled."""
         if self.ssl_enabled:
-            self.ssl_context = ssl.create_default_context()
-            if self.ssl_context:  # Ensure ssl_context is not None
-                self.ssl_context.check_hostname = False
-                self.ssl_context.verify_mode = ssl.CERT_NONE
-                logger.info("SSL enabled: Using SSL for secure connections")
+            self.ssl_context = create_ssl_context()
+            logger.info("SSL enabled: Using SSL for secure connections")
         else:
             logger.info("SSL not enabled: Using plain TCP connections")
 
+    def _connect(self) -> ClientSocket:
+        """Open a new connection to the server. The caller must hold a slot for it."""
+        client_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        try:
+            if self.ssl_enabled and self.ssl_context:
+                client_socket = self.ssl_context.wrap_socket(
+                    client_socket, server_hostname=self.host
+                )
+            client_socket.connect((self.host, self.port))
+        except Exception:
+            client_socket.close()
+            raise
+        logger.info("Connected to server at %s:%d", self.host, self.port)
+        return client_socket
+
+    def _acquire(self) -> ClientSocket:
+        """
+        Take an idle connection from the pool, or open one if fewer than
+        max_connections are open. Otherwise wait for a connection to be
+        returned to the pool or closed.
+        """
+        while True:
+            try:
+                return self._pool.get_nowait()
+            except queue.Empty:
+                pass
+            if self._slots.acquire(blocking=False):
+                try:
+                    return self._connect()
+                except BaseException:
+                    self._slots.release()
+                    raise
+            try:
+                return self._pool.get(timeout=POOL_WAIT)
+            except queue.Empty:
+                pass  # A connection may have been closed instead, freeing its slot
+
+    def _release(self, client_socket: ClientSocket) -> None:
+        """Return a connection to the pool, closing it if the pool is full."""
+        try:
+            self._pool.put_nowait(client_socket)
+        except queue.Full:
+            self._discard(client_socket)
+
+    def _discard(self, client_socket: ClientSocket) -> None:
+        """Close a connection and free its slot."""
+        client_socket.close()
+        self._slots.release()
+
+    @staticmethod
+    def _exchange(client_socket: ClientSocket, request: bytes) -> bytearray:
+        """Send request bytes over a connection and wait for the response."""
+        client_socket.sendall(request)
+        response = recv_message(client_socket)
+        if response is None:
+            raise ConnectionError("Connection closed by server")
+        return response
+
+    def _request(self, request: bytes) -> str:
+        """
+        Send framed request bytes over a pooled connection and wait for the response.
+
+        The server may have dropped an idle pooled connection, so a failed
+        first attempt is retried once on a new connection.
+
+        :param request: One or more framed messages.
+        :return: The server response.
+        """
+        client_socket = self._acquire()
+        try:
+            try:
+                response = self._exchange(client_socket, request)
+            except (ConnectionError, OSError):
+                # Retry in the slot of the connection that failed
+                client_socket.close()
+                client_socket = self._connect()
+                response = self._exchange(client_socket, request)
+        except BaseException:
+            self._discard(client_socket)
+            raise
+        text = response.decode("utf-8")
+        if text in CLOSING_RESPONSES:
+            self._discard(client_socket)  # Not reusable: the server may have hung up
+        else:
+            self._release(client_socket)
+        return text
+
     def send_query(self, query: str) -> str:
         """
         Send a query to the server and return the response.
@@ -57,27 +180,12 @@ class FileSearchClient:
         """
         if not query.strip():
             logger.error("Error: Empty query")
-            return "ERROR: Empty query"
+            return ERROR_EMPTY_QUERY
 
         try:
-            client_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
             start_time = time.time()  # Start timing
-
-            if self.ssl_enabled and self.ssl_context:
-                with self.ssl_context.wrap_socket(
-                    client_socket, server_hostname=self.host
-                ) as ssl_socket:
-                    ssl_socket.connect((self.host, self.port))
-                    logger.info("Connected to server at %s:%d", self.host, self.port)
-                    ssl_socket.sendall(query.encode("utf-8"))
-                    response = ssl_socket.recv(1024).decode("utf-8")
-                    logger.info("Received response: %s", response)
-            else:
-                client_socket.connect((self.host, self.port))
-                logger.info("Connected to server at %s:%d", self.host, self.port)
-                client_socket.sendall(query.encode("utf-8"))
-                response = client_socket.recv(1024).decode("utf-8")
-                logger.info("Received response: %s", response)
+            response = self._request(encode_message(query.encode("utf-8")))
+            logger.info("Received response: %s", response)
 
             end_time = time.time()  # End timing
             execution_time = end_time - start_time
@@ -86,8 +194,46 @@ class FileSearchClient:
         except Exception as e:
             logger.error("Error communicating with server: %s", e)
             return "ERROR: Communication failed\n"
-        finally:
-            client_socket.close()
+
+    def send_batch(self, queries: List[str]) -> List[str]:
+        """
+        Send several queries to the server in one round trip.
+
+        :param queries: The query strings to send.
+        :return: The server response for each query, in order.
+        """
+        if not queries:
+            return []
+
+        try:
+            start_time = time.time()  # Start timing
+            request = encode_message(str(len(queries)).encode("utf-8"), batch=True)
+            request += b"".join(encode_message(q.encode("utf-8")) for q in queries)
+            header, *results = self._request(request).split("\n")
+            if header != f"BATCH {len(queries)}" or len(results) != len(queries):
+                # The server answered with a single error for the whole batch
+                logger.error("Batch rejected by server: %s", header)
+                return [header] * len(queries)
+
+            end_time = time.time()  # End timing
+            execution_time = end_time - start_time
+            logger.info(
+                "Batch of %d queries execution time: %.4f seconds",
+                len(queries),
+                execution_time,
+            )
+            return results
+        except Exception as e:
+            logger.error("Error communicating with server: %s", e)
+            return ["ERROR: Communication failed\n"] * len(queries)
+
+    def close(self) -> None:
+        """Close all idle connections held in the pool."""
+        while True:
+            try:
+                self._discard(self._pool.get_nowait())
+            except queue.Empty:
+                break
 
 
 if __name__ == "__main__":
@@ -100,3 +246,4 @@ if __name__ == "__main__":
             break
         response = client.send_query(query)
         print(f"Server response: {response}")
+    client.close()
@@ -2,34 +2,396 @@ import time
 import random
 import string
 import os
+import bisect
+import functools
 import configparser
-from typing import List, Callable, Tuple, cast, Union
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import pysubstringsearch
+import tempfile
+from numba import njit
+from typing import List, Callable, Tuple, cast, Union, Optional, FrozenSet, Dict
 
 # Read the configuration
 config = configparser.ConfigParser()
 config.read("config.ini")
 REREAD_ON_QUERY = config.getboolean("Settings", "REREAD_ON_QUERY")
 
+# Lookup structures built from the most recently searched `data` list. They
+# are keyed on the identity of the list, so repeated queries against the same
+# list skip the preprocessing; a list modified in place is not detected.
+_line_index: Tuple[Optional[List[str]], FrozenSet[str]] = (None, frozenset())
+_sorted_index: Tuple[Optional[List[str]], List[str]] = (None, [])
+_suffix_index: Tuple[Optional[List[str]], Optional[pysubstringsearch.Reader]] = (
+    None,
+    None,
+)
+
+# Stripped lines of a data list, with their UTF-8 encodings laid end to end
+# in one uint8 array and the [start, end) offsets of each line within it
+ByteIndex = Tuple[List[str], np.ndarray, np.ndarray, np.ndarray]
+_byte_index: Tuple[Optional[List[str]], Optional[ByteIndex]] = (None, None)
+
+
+def _build_index(data: List[str]) -> FrozenSet[str]:
+    """
+    Return the set of stripped lines of `data`, reusing it across calls.
+
+    Args:
+        data: A list of strings to index.
+
+    Returns:
+        A frozenset of the stripped lines.
+    """
+    global _line_index
+    if _line_index[0] is not data:
+        _line_index = (data, frozenset(line.strip() for line in data))
+    return _line_index[1]
+
+
+def _build_sorted(data: List[str]) -> List[str]:
+    """
+    Return the sorted stripped lines of `data`, reusing them across calls.
+
+    Args:
+        data: A list of strings to sort.
+
+    Returns:
+        A sorted list of the stripped lines.
+    """
+    global _sorted_index
+    if _sorted_index[0] is not data:
+        _sorted_index = (data, sorted(line.strip() for line in data))
+    return _sorted_index[1]
+
+
+def _contains_search(data: List[str], query: str) -> List[str]:
+    """
+    Substring search using the `in` operator, which runs CPython's C
+    fastsearch (a Boyer-Moore-Horspool variant).
+
+    Args:
+        data: A list of strings to search within.
+        query: The string to search for.
+
+    Returns:
+        A list of lines that contain the query.
+    """
+    return [line for line in map(str.strip, data) if query in line]
+
+
+def _build_suffix_index(data: List[str]) -> pysubstringsearch.Reader:
+    """
+    Return a suffix array index of the stripped lines of `data`, reusing it
+    across calls.
+
+    Args:
+        data: A list of strings to index.
+
+    Returns:
+        A reader over the suffix array index.
+    """
+    global _suffix_index
+    reader = _suffix_index[1]
+    if _suffix_index[0] is not data or reader is None:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            # The reader loads the index when opened, so the file can go
+            index_path = os.path.join(tmp_dir, "lines.idx")
+            writer = pysubstringsearch.Writer(index_file_path=index_path)
+            for line in data:
+                writer.add_entry(line.strip())
+            writer.finalize()
+            reader = pysubstringsearch.Reader(index_file_path=index_path)
+        _suffix_index = (data, reader)
+    return reader
+
+
+def _build_byte_index(data: List[str]) -> ByteIndex:
+    """
+    Return the stripped lines of `data` encoded into one uint8 array for the
+    compiled kernels, reusing them across calls.
+
+    Substring matches on UTF-8 bytes are the same as on the decoded text.
+
+    Args:
+        data: A list of strings to index.
+
+    Returns:
+        The stripped lines, the array of their encodings, and the start and
+        end offset of each line in the array.
+    """
+    global _byte_index
+    index = _byte_index[1]
+    if _byte_index[0] is not data or index is None:
+        lines = [line.strip() for line in data]
+        encoded = [line.encode("utf-8") for line in lines]
+        buf = np.frombuffer(b"".join(encoded), dtype=np.uint8)
+        lengths = np.fromiter(map(len, encoded), dtype=np.int64, count=len(encoded))
+        ends = np.cumsum(lengths)
+        index = (lines, buf, ends - lengths, ends)
+        _byte_index = (data, index)
+    return index
+
+
+# Pattern preprocessing. These only depend on the query, so they are cached
+# and repeated queries skip the preprocessing entirely. The returned tables
+# are shared between calls and must not be modified.
+
+
+@functools.lru_cache(maxsize=1024)
+def _compute_lps(pattern: Union[str, bytes]) -> Tuple[int, ...]:
+    """
+    Compute the KMP longest proper prefix-suffix table of a pattern.
+
+    Args:
+        pattern: The pattern to preprocess.
+
+    Returns:
+        The length of the longest proper prefix that is also a suffix, for
+        each prefix of the pattern.
+    """
+    lps = [0] * len(pattern)
+    length = 0
+    i = 1
+    while i < len(pattern):
+        if pattern[i] == pattern[length]:
+            length += 1
+            lps[i] = length
+            i += 1
+        else:
+            if length != 0:
+                length = lps[length - 1]
+            else:
+                lps[i] = 0
+                i += 1
+    return tuple(lps)
+
+
+@functools.lru_cache(maxsize=1024)
+def _bad_char_table(pattern: str) -> Dict[str, int]:
+    """
+    Compute the Boyer-Moore bad character shift table of a pattern.
+
+    Args:
+        pattern: The pattern to preprocess.
+
+    Returns:
+        The shift for each character of the pattern but the last.
+    """
+    table = {}
+    for i in range(len(pattern) - 1):
+        table[pattern[i]] = len(pattern) - 1 - i
+    return table
+
+
+@functools.lru_cache(maxsize=1024)
+def _bad_byte_table(pattern: bytes) -> np.ndarray:
+    """
+    Compute the Boyer-Moore bad character shift table of an encoded pattern,
+    as an array indexed by byte value for the compiled kernel.
+
+    Args:
+        pattern: The pattern to preprocess.
+
+    Returns:
+        The shift for each byte value.
+    """
+    table = np.full(256, len(pattern), dtype=np.int64)
+    for i in range(len(pattern) - 1):
+        table[pattern[i]] = len(pattern) - 1 - i
+    return table
+
+
+@functools.lru_cache(maxsize=1024)
+def _good_suffix_table(pattern: Union[str, bytes]) -> Tuple[int, ...]:
+    """
+    Compute the Boyer-Moore good suffix shift table of a pattern.
+
+    Args:
+        pattern: The pattern to preprocess.
+
+    Returns:
+        The shift for each number of matched trailing characters.
+    """
+    table = [0] * len(pattern)
+    last_prefix = len(pattern)
+    for i in range(len(pattern) - 1, -1, -1):
+        if _is_prefix(pattern, i + 1):
+            last_prefix = i + 1
+        table[len(pattern) - 1 - i] = last_prefix - i + len(pattern) - 1
+    for i in range(len(pattern) - 1):
+        slen = _suffix_length(pattern, i)
+        table[slen] = len(pattern) - 1 - i + slen
+    return tuple(table)
+
+
+def _is_prefix(pattern: Union[str, bytes], p: int) -> bool:
+    j = 0
+    for i in range(p, len(pattern)):
+        if pattern[i] != pattern[j]:
+            return False
+        j += 1
+    return True
+
+
+def _suffix_length(pattern: Union[str, bytes], p: int) -> int:
+    length = 0
+    j = len(pattern) - 1
+    for i in range(p, -1, -1):
+        if pattern[i] == pattern[j]:
+            length += 1
+            j -= 1
+        else:
+            break
+    return length
+
+
+# Compiled kernels. Numba compiles these loops to machine code on first
+# use. They scan the lines of a byte index and flag each line that contains
+# the pattern; the caller must handle an empty pattern.
+
+
+@njit
+def _kmp_kernel(
+    buf: np.ndarray,
+    starts: np.ndarray,
+    ends: np.ndarray,
+    pattern: np.ndarray,
+    lps: np.ndarray,
+) -> np.ndarray:
+    m = pattern.size
+    found = np.zeros(starts.size, dtype=np.bool_)
+    for k in range(starts.size):
+        i = starts[k]
+        end = ends[k]
+        if end - i < m:  # Skip lines shorter than the query
+            continue
+        j = 0
+        while i < end:
+            if pattern[j] == buf[i]:
+                i += 1
+                j += 1
+                if j == m:
+                    found[k] = True
+                    break  # One match is enough to report the line
+            elif j != 0:
+                j = lps[j - 1]
+            else:
+                i += 1
+    return found
+
+
+@njit
+def _boyer_moore_kernel(
+    buf: np.ndarray,
+    starts: np.ndarray,
+    ends: np.ndarray,
+    pattern: np.ndarray,
+    bad_char: np.ndarray,
+    good_suffix: np.ndarray,
+) -> np.ndarray:
+    last = pattern.size - 1
+    found = np.zeros(starts.size, dtype=np.bool_)
+    for k in range(starts.size):
+        end = ends[k]
+        i = starts[k] + last
+        while i < end:
+            j = last
+            while j >= 0 and buf[i] == pattern[j]:
+                i -= 1
+                j -= 1
+            if j < 0:
+                found[k] = True
+                break  # One match is enough to report the line
+            i += max(good_suffix[last - j], bad_char[buf[i]])
+    return found
+
+
+@njit
+def _rabin_karp_kernel(
+    buf: np.ndarray, starts: np.ndarray, ends: np.ndarray, pattern: np.ndarray
+) -> np.ndarray:
+    q = 101  # A prime number
+    d = 256  # Number of values a byte can take
+    m = pattern.size
+    h = 1
+    for _ in range(m - 1):
+        h = (h * d) % q
+    p = 0
+    for i in range(m):
+        p = (d * p + pattern[i]) % q
+
+    found = np.zeros(starts.size, dtype=np.bool_)
+    for k in range(starts.size):
+        start = starts[k]
+        n = ends[k] - start
+        if n < m:  # Skip lines shorter than the query
+            continue
+        t = 0
+        for i in range(m):
+            t = (d * t + buf[start + i]) % q
+
+        for i in range(n - m + 1):
+            if p == t:
+                j = 0
+                while j < m and buf[start + i + j] == pattern[j]:
+                    j += 1
+                if j == m:
+                    found[k] = True
+                    break  # One match is enough to report the line
+            if i < n - m:
+                # Numba keeps Python's never-negative % for signed integers
+                t = (d * (t - buf[start + i] * h) + buf[start + i + m]) % q
+    return found
+
+
+def _run_kernel(
+    data: List[str],
+    query: str,
+    kernel: Callable[..., np.ndarray],
+    *tables: np.ndarray,
+) -> List[str]:
+    """
+    Run a compiled kernel over the lines of `data`.
+
+    Args:
+        data: A list of strings to search within.
+        query: The string to search for.
+        kernel: The kernel to run.
+        tables: The kernel's pattern tables, if any.
+
+    Returns:
+        A list of lines that contain the query.
+    """
+    lines, buf, starts, ends = _build_byte_index(data)
+    if not query:
+        return list(lines)  # Every line contains the empty string
+    pattern = np.frombuffer(query.encode("utf-8"), dtype=np.uint8)
+    found = kernel(buf, starts, ends, pattern, *tables)
+    return [lines[k] for k in np.flatnonzero(found)]
+
+
 # Search algorithms
 
 
 def naive_search(data: List[str], query: str) -> List[str]:
     """
-    Naïve String Matching Algorithm.
+    Naïve String Matching Algorithm, answered with a hashed set of the lines.
 
     Args:
         data: A list of strings to search within.
         query: The string to search for.
 
     Returns:
-        A list of lines that exactly match the query.
+        A list containing the query if a line exactly matches it.
     """
-    return [line.strip() for line in data if line.strip() == query]
+    return [query] if query in _build_index(data) else []
 
 
 def binary_search(data: List[str], query: str) -> List[str]:
     """
-    Binary Search Algorithm.
+    Binary Search Algorithm over the lines, sorted once per data list.
 
     Args:
         data: A list of strings to search within.
@@ -38,136 +400,91 @@ def binary_search(data: List[str], query: str) -> List[str]:
     Returns:
         A list containing the found query.
     """
-    sorted_data = sorted(line.strip() for line in data)
-    low, high = 0, len(sorted_data) - 1
-    while low <= high:
-        mid = (low + high) // 2
-        if sorted_data[mid] == query:
-            return [sorted_data[mid]]
-        elif sorted_data[mid] < query:
-            low = mid + 1
-        else:
-            high = mid - 1
+    sorted_data = _build_sorted(data)
+    i = bisect.bisect_left(sorted_data, query)
+    if i < len(sorted_data) and sorted_data[i] == query:
+        return [sorted_data[i]]
     return []
 
 
-def kmp_search(data: List[str], query: str) -> List[str]:
+def kmp_search(
+    data: List[str], query: str, pure_python: bool = False
+) -> List[str]:
     """
     Knuth-Morris-Pratt (KMP) Algorithm.
 
     Args:
         data: A list of strings to search within.
         query: The string to search for.
+        pure_python: Run the Python implementation of the algorithm instead
+            of CPython's C substring search, e.g. for benchmarking.
 
     Returns:
         A list of lines that contain the query.
     """
-
-    def compute_lps(pattern: str) -> List[int]:
-        lps = [0] * len(pattern)
-        length = 0
-        i = 1
-        while i < len(pattern):
-            if pattern[i] == pattern[length]:
-                length += 1
-                lps[i] = length
-                i += 1
-            else:
-                if length != 0:
-                    length = lps[length - 1]
-                else:
-                    lps[i] = 0
-                    i += 1
-        return lps
+    if not pure_python:
+        return _contains_search(data, query)
 
     results = []
-    lps = compute_lps(query)
+    lps = _compute_lps(query)
+    m = len(query)
     for line in data:
         line = line.strip()
+        n = len(line)
+        if n < m:  # Skip lines shorter than the query
+            continue
         i, j = 0, 0
-        while i < len(line):
+        while i < n:
             if query[j] == line[i]:
                 i += 1
                 j += 1
-            if j == len(query):
-                results.append(line)
+                if j == m:
+                    results.append(line)
+                    break  # One match is enough to report the line
+            elif j != 0:
                 j = lps[j - 1]
-            elif i < len(line) and query[j] != line[i]:
-                if j != 0:
-                    j = lps[j - 1]
-                else:
-                    i += 1
+            else:
+                i += 1
     return results
 
 
-def boyer_moore_search(data: List[str], query: str) -> List[str]:
+def boyer_moore_search(
+    data: List[str], query: str, pure_python: bool = False
+) -> List[str]:
     """
     Boyer-Moore Algorithm.
 
     Args:
         data: A list of strings to search within.
         query: The string to search for.
+        pure_python: Run the Python implementation of the algorithm instead
+            of CPython's C substring search, e.g. for benchmarking.
 
     Returns:
         A list of lines that contain the query.
     """
+    if not pure_python:
+        return _contains_search(data, query)
 
-    def bad_char_table(pattern: str) -> dict:
-        table = {}
-        for i in range(len(pattern) - 1):
-            table[pattern[i]] = len(pattern) - 1 - i
-        return table
-
-    def good_suffix_table(pattern: str) -> List[int]:
-        table = [0] * len(pattern)
-        last_prefix = len(pattern)
-        for i in range(len(pattern) - 1, -1, -1):
-            if is_prefix(pattern, i + 1):
-                last_prefix = i + 1
-            table[len(pattern) - 1 - i] = last_prefix - i + len(pattern) - 1
-        for i in range(len(pattern) - 1):
-            slen = suffix_length(pattern, i)
-            table[slen] = len(pattern) - 1 - i + slen
-        return table
-
-    def is_prefix(pattern: str, p: int) -> bool:
-        j = 0
-        for i in range(p, len(pattern)):
-            if pattern[i] != pattern[j]:
-                return False
-            j += 1
-        return True
-
-    def suffix_length(pattern: str, p: int) -> int:
-        length = 0
-        j = len(pattern) - 1
-        for i in range(p, -1, -1):
-            if pattern[i] == pattern[j]:
-                length += 1
-                j -= 1
-            else:
-                break
-        return length
-
-    bad_char = bad_char_table(query)
-    good_suffix = good_suffix_table(query)
+    bad_char = _bad_char_table(query)
+    good_suffix = _good_suffix_table(query)
 
     results = []
+    m = len(query)
+    last = m - 1
     for line in data:
         line = line.strip()
-        i = len(query) - 1
-        while i < len(line):
-            j = len(query) - 1
+        n = len(line)
+        i = last
+        while i < n:
+            j = last
             while j >= 0 and line[i] == query[j]:
                 i -= 1
                 j -= 1
             if j < 0:
                 results.append(line)
-                i += len(query) + 1
-            else:
-                i += max(
-                    good_suffix[len(query) - 1 - j], bad_char.get(line[i], len(query))
-                )
+                break  # One match is enough to report the line
+            i += max(good_suffix[last - j], bad_char.get(line[i], m))
     return results
 
 
@@ -185,8 +502,10 @@ def rabin_karp_search(data: List[str], query: str) -> List[str]:
     q = 101  # A prime number
     d = 256  # Number of characters in the input alphabet
     m = len(query)
-    h = pow(d, m - 1) % q
+    h = pow(d, m - 1, q)
     p = 0
+    for c in query:  # The query hash only depends on the query
+        p = (d * p + ord(c)) % q
     results = []
 
     for line in data:
@@ -194,34 +513,86 @@ def rabin_karp_search(data: List[str], query: str) -> List[str]:
         n = len(line)
         if n < m:  # Skip lines shorter than the query
             continue
+        codes = list(map(ord, line))
         t = 0
         for i in range(m):
-            p = (d * p + ord(query[i])) % q
-            t = (d * t + ord(line[i])) % q
+            t = (d * t + codes[i]) % q
 
         for i in range(n - m + 1):
-            if p == t:
-                if line[i : i + m] == query:
-                    results.append(line)
+            if p == t and line[i : i + m] == query:
+                results.append(line)
+                break  # One match is enough to report the line
             if i < n - m:
-                t = (d * (t - ord(line[i]) * h) + ord(line[i + m])) % q
-                if t < 0:
-                    t += q
+                # Python's % is never negative for a positive modulus
+                t = (d * (t - codes[i] * h) + codes[i + m]) % q
 
     return results
 
 
-def z_algorithm_search(data: List[str], query: str) -> List[str]:
+def kmp_numba_search(data: List[str], query: str) -> List[str]:
+    """
+    Knuth-Morris-Pratt (KMP) Algorithm, compiled with Numba.
+
+    Args:
+        data: A list of strings to search within.
+        query: The string to search for.
+
+    Returns:
+        A list of lines that contain the query.
+    """
+    lps = np.array(_compute_lps(query.encode("utf-8")), dtype=np.int64)
+    return _run_kernel(data, query, _kmp_kernel, lps)
+
+
+def boyer_moore_numba_search(data: List[str], query: str) -> List[str]:
+    """
+    Boyer-Moore Algorithm, compiled with Numba.
+
+    Args:
+        data: A list of strings to search within.
+        query: The string to search for.
+
+    Returns:
+        A list of lines that contain the query.
+    """
+    pattern = query.encode("utf-8")
+    good_suffix = np.array(_good_suffix_table(pattern), dtype=np.int64)
+    return _run_kernel(
+        data, query, _boyer_moore_kernel, _bad_byte_table(pattern), good_suffix
+    )
+
+
+def rabin_karp_numba_search(data: List[str], query: str) -> List[str]:
+    """
+    Rabin-Karp Algorithm, compiled with Numba.
+
+    Args:
+        data: A list of strings to search within.
+        query: The string to search for.
+
+    Returns:
+        A list of lines that contain the query.
+    """
+    return _run_kernel(data, query, _rabin_karp_kernel)
+
+
+def z_algorithm_search(
+    data: List[str], query: str, pure_python: bool = False
+) -> List[str]:
     """
     Z Algorithm.
 
     Args:
         data: A list of strings to search within.
         query: The string to search for.
+        pure_python: Run the Python implementation of the algorithm instead
+            of CPython's C substring search, e.g. for benchmarking.
 
     Returns:
         A list of lines that contain the query.
     """
+    if not pure_python:
+        return _contains_search(data, query)
 
     def calculate_z_array(s: str) -> List[int]:
         z = [0] * len(s)
@@ -246,17 +617,51 @@ def z_algorithm_search(data: List[str], query: str) -> List[str]:
         return z
 
     results = []
-    concat = query + "$" + "".join(data)
-    z_array = calculate_z_array(concat)
     query_length = len(query)
-    for i in range(query_length + 1, len(z_array)):
-        if z_array[i] == query_length:
-            results.append(
-                concat[i - query_length - 1 : i - query_length - 1 + query_length]
-            )
+    # Each line is searched on its own, so only one line is ever copied and
+    # matches cannot span two lines. NUL separates the query from the line
+    # since it does not occur in text files.
+    prefix = query + "\0"
+    for line in data:
+        line = line.strip()
+        if len(line) < query_length:  # Skip lines shorter than the query
+            continue
+        z_array = calculate_z_array(prefix + line)
+        if query_length in z_array[query_length + 1 :]:
+            results.append(line)
     return results
 
 
+def suffix_array_search(data: List[str], query: str) -> List[str]:
+    """
+    Suffix Array search, answered in O(m log N) from an index of the lines
+    built once per data list.
+
+    Args:
+        data: A list of strings to search within.
+        query: The string to search for.
+
+    Returns:
+        A list of lines that contain the query.
+    """
+    return _build_suffix_index(data).search(query)
+
+
+def arrow_match_search(data: List[str], query: str) -> List[str]:
+    """
+    Vectorized substring match using Arrow's C++ compute kernels.
+
+    Args:
+        data: A list of strings to search within.
+        query: The string to search for.
+
+    Returns:
+        A list of lines that contain the query.
+    """
+    lines = pc.utf8_trim_whitespace(pa.array(data, type=pa.string()))
+    return lines.filter(pc.match_substring(lines, query)).to_pylist()
+
+
 # Helper functions
 
 
@@ -303,15 +708,28 @@ def benchmark_search_algorithms() -> List[Tuple[str, int, float, bool]]:
         A list of tuples containing the algorithm name, file size, and execution time.
     """
     results = []
-    algorithms = {
+    algorithms: Dict[str, Callable[[List[str], str], List[str]]] = {
         "naive": naive_search,
         "binary": binary_search,
-        "kmp": kmp_search,
-        "boyer_moore": boyer_moore_search,
+        "kmp": functools.partial(kmp_search, pure_python=True),
+        "boyer_moore": functools.partial(boyer_moore_search, pure_python=True),
         "rabin_karp": rabin_karp_search,
-        "z_algorithm": z_algorithm_search,
+        "kmp_numba": kmp_numba_search,
+        "boyer_moore_numba": boyer_moore_numba_search,
+        "rabin_karp_numba": rabin_karp_numba_search,
+        "z_algorithm": functools.partial(z_algorithm_search, pure_python=True),
+        "suffix_array": suffix_array_search,
+        "arrow_match": arrow_match_search,
     }
 
+    # Compile the Numba kernels up front so no timing includes compilation
+    for kernel_search in (
+        kmp_numba_search,
+        boyer_moore_numba_search,
+        rabin_karp_numba_search,
+    ):
+        kernel_search(["warm up"], "up")
+
     file_sizes = [10000, 50000, 100000, 250000, 500000, 750000, 1000000]
     for size in file_sizes:
         filename = f"test_file_{size}.txt"
@@ -322,6 +740,22 @@ def benchmark_search_algorithms() -> List[Tuple[str, int, float, bool]]:
         query = "".join(random.choices(string.ascii_letters + string.digits, k=20))
 
         for reread in [True, False]:
+            if not reread:
+                # Build the lookup structures just before the cached pass so
+                # its timings only measure query cost. Each structure is only
+                # cached for one list, so building them earlier would be
+                # undone by the reread pass, which rebuilds them on every call.
+                start_time = time.time()
+                indexes = (
+                    _build_index(data),
+                    _build_sorted(data),
+                    _build_suffix_index(data),
+                    _build_byte_index(data),
+                )
+                print(
+                    f"Index build time for File Size {size}: {time.time() - start_time:.4f}s"
+                )
+
             for algorithm_name, algorithm_func in algorithms.items():
                 start_time = time.time()
                 search(
@@ -337,6 +771,18 @@ def benchmark_search_algorithms() -> List[Tuple[str, int, float, bool]]:
                     f"Algorithm: {algorithm_name}, File Size: {size}, Execution Time: {execution_time:.4f}s, Reread: {reread}"
                 )
 
+            if not reread:
+                # Every cached search must have reused the structures built above
+                cached = (
+                    _line_index[1],
+                    _sorted_index[1],
+                    _suffix_index[1],
+                    _byte_index[1],
+                )
+                assert all(a is b for a, b in zip(indexes, cached)), (
+                    "Index rebuilt during the cached pass"
+                )
+
         os.remove(filename)
 
     return results
@@ -346,9 +792,9 @@ if __name__ == "__main__":
     benchmark_results = benchmark_search_algorithms()
     with open("benchmark_results.txt", "w") as f:
         f.write(
-            f"{'Algorithm':<15}{'File Size':<15}{'Execution Time (s)':<20}{'Reread':<10}\n"
+            f"{'Algorithm':<20}{'File Size':<15}{'Execution Time (s)':<20}{'Reread':<10}\n"
         )
         for result in benchmark_results:
             f.write(
-                f"{result[0]:<15}{result[1]:<15}{result[2]:<20.4f}{result[3]:<10}\n"
+                f"{result[0]:<20}{result[1]:<15}{result[2]:<20.4f}{result[3]:<10}\n"
             )
@@ -0,0 +1,99 @@
+import socket
+import struct
+from typing import Optional, Tuple, Union
+
+# Every message is sent as a 4-byte big-endian payload length followed by
+# the payload itself, so several messages can share one connection
+_HEADER = struct.Struct(">I")
+HEADER_SIZE = _HEADER.size
+
+# The top bit of the length header marks the message that starts a batch.
+# It is kept out of the payload so that no query text can pass for one.
+BATCH_FLAG = 0x80000000
+
+# Server responses
+STRING_EXISTS = "STRING EXISTS"
+STRING_NOT_FOUND = "STRING NOT FOUND"
+ERROR_EMPTY_QUERY = "ERROR: Empty query"
+ERROR_PAYLOAD_TOO_LARGE = "ERROR: Payload too large"
+ERROR_INVALID_BATCH = "ERROR: Invalid batch"
+ERROR_INTERNAL = "ERROR: Internal server error"
+
+# Responses after which the server may close the connection. An internal
+# error ends the connection when the request itself failed, but may also
+# answer a query on a connection that stays open; a client should not reuse
+# the connection either way.
+CLOSING_RESPONSES = (ERROR_PAYLOAD_TOO_LARGE, ERROR_INVALID_BATCH, ERROR_INTERNAL)
+
+# Largest buffer recv_exact() allocates before any of the payload arrives;
+# every valid response, a full batch included, fits in it
+PREALLOCATE_LIMIT = 64 * 1024
+
+
+def encode_message(payload: bytes, batch: bool = False) -> bytes:
+    """
+    Frame a payload for sending.
+
+    :param payload: The message payload.
+    :param batch: Whether the message is a batch header.
+    :return: The length header followed by the payload.
+    """
+    return _HEADER.pack(len(payload) | (BATCH_FLAG if batch else 0)) + payload
+
+
+def decode_header(header: Union[bytes, bytearray]) -> Tuple[int, bool]:
+    """
+    Decode a length header.
+
+    :param header: The HEADER_SIZE bytes preceding a payload.
+    :return: The length of the payload that follows, and whether the message is a batch header.
+    """
+    value = _HEADER.unpack(header)[0]
+    return value & ~BATCH_FLAG, bool(value & BATCH_FLAG)
+
+
+def recv_exact(sock: socket.socket, size: int) -> bytearray:
+    """
+    Receive exactly `size` bytes, looping over short reads.
+
+    The bytes are received straight into one buffer rather than into a new
+    bytes object per read that then has to be joined. The buffer is
+    preallocated up to PREALLOCATE_LIMIT bytes and only grows past that as
+    data arrives, so a bogus length from the peer cannot make it allocate
+    memory that is never filled.
+
+    :param sock: The socket to read from.
+    :param size: The number of bytes to read.
+    :return: The bytes read, shorter than `size` only if the peer closed the connection.
+    """
+    buffer = bytearray(min(size, PREALLOCATE_LIMIT))
+    received = 0
+    while received < size:
+        if received == len(buffer):
+            # Full: double it, up to size. A bytearray cannot be resized
+            # while a memoryview of it is alive, hence one view per read.
+            buffer.extend(bytes(min(len(buffer), size - received)))
+        with memoryview(buffer) as view:
+            count = sock.recv_into(view[received:])
+        if not count:
+            break
+        received += count
+    del buffer[received:]
+    return buffer
+
+
+def recv_message(sock: socket.socket) -> Optional[bytearray]:
+    """
+    Receive one framed message.
+
+    :param sock: The socket to read from.
+    :return: The message payload, or None if the connection was closed.
+    """
+    header = recv_exact(sock, HEADER_SIZE)
+    if len(header) < HEADER_SIZE:
+        return None
+    size, _ = decode_header(header)
+    payload = recv_exact(sock, size)
+    if len(payload) < size:
+        return None
+    return payload
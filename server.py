@@ -1,11 +1,28 @@
+import asyncio
+import atexit
 import os
 import socket
 import threading
 import configparser
+import concurrent.futures
 import ssl
 import logging
+import logging.handlers
+import queue
+import re
 import time
-from typing import Optional, List
+from typing import AbstractSet, Any, Callable, Dict, FrozenSet, List, Optional, Set, Tuple, TypeVar
+from protocol import (
+    ERROR_EMPTY_QUERY,
+    ERROR_INTERNAL,
+    ERROR_INVALID_BATCH,
+    ERROR_PAYLOAD_TOO_LARGE,
+    HEADER_SIZE,
+    STRING_EXISTS,
+    STRING_NOT_FOUND,
+    decode_header,
+    encode_message,
+)
 
 # Load configuration settings
 config = configparser.ConfigParser()
@@ -20,13 +37,121 @@ HOST = config.get("Server", "host", fallback="localhost")
 PORT = config.getint("Server", "port", fallback=12345)
 SSL_ENABLED = config.getboolean("Server", "ssl_enabled", fallback=True)
 BUFFER_SIZE = config.getint("Server", "buffer_size", fallback=1024)
+MAX_BATCH = config.getint("Server", "max_batch", fallback=1000)
+MAX_WORKERS = config.getint("Server", "max_workers", fallback=64)
+
+R = TypeVar("R")
+
+# Batches at least this large are answered with one pass over the file's
+# contents rather than one scan per query (measured break-even on 200k.txt)
+SINGLE_PASS_MIN_QUERIES = 6
+
+# Whitespace that bytes.strip() removes from a line, other than the newline
+_LINE_PADDING = rb"[ \t\r\x0b\x0c]*"
+
+# The fixed responses are encoded and framed once here rather than per request
+FRAMED_RESPONSES: Dict[str, bytes] = {
+    response: encode_message(response.encode("utf-8"))
+    for response in (
+        STRING_EXISTS,
+        STRING_NOT_FOUND,
+        ERROR_EMPTY_QUERY,
+        ERROR_PAYLOAD_TOO_LARGE,
+        ERROR_INVALID_BATCH,
+        ERROR_INTERNAL,
+    )
+}
 
-# Set up logging to track server activity
+# Set up logging to track server activity. Records are handed to a
+# background listener thread through a queue, so a request never waits on
+# the log stream's lock or I/O.
+# The QueueHandler formats each record before queueing it, so the stream
+# handler only writes out the finished message.
+log_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+log_listener = logging.handlers.QueueListener(log_queue, logging.StreamHandler())
+log_listener.start()
+atexit.register(log_listener.stop)  # Flush pending records on exit
 logging.basicConfig(
-    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
+    level=logging.INFO,
+    format="%(asctime)s - %(levelname)s - %(message)s",
+    handlers=[logging.handlers.QueueHandler(log_queue)],
 )
 logger = logging.getLogger()
 
+
+class PayloadTooLargeError(Exception):
+    """Raised when a client announces a message larger than BUFFER_SIZE."""
+
+
+class InvalidBatchError(Exception):
+    """Raised when a batch header does not hold a valid query count."""
+
+
+# Identifies a version of the file, see _file_key
+FileKey = Tuple[str, int, int, float]
+
+
+def _file_key(path: str) -> FileKey:
+    """
+    Identify the current version of a file, so that data loaded from it can
+    be reused until it changes.
+
+    A file can be replaced or rewritten without a visible change to its
+    modification time, so its inode and size are compared as well.
+
+    :param path: The path to the file.
+    :return: The path, inode, size and modification time of the file.
+    """
+    st = os.stat(path)
+    return (path, st.st_ino, st.st_size, st.st_mtime)
+
+
+def _contains_line(buf: bytes, line: bytes) -> bool:
+    """
+    Check whether a buffer of newline-separated lines contains a line that,
+    stripped of surrounding whitespace, equals `line`.
+
+    Lines are compared exactly as the cached index compares them, whatever
+    their line endings. Plain C-level searches settle the common cases;
+    only a query that occurs in the buffer but not as a whole LF or CRLF
+    terminated line falls back to an anchored regular expression.
+
+    :param buf: The buffer to search.
+    :param line: The stripped line to look for.
+    :return: True if the line is present.
+    """
+    if b"\n" in line or buf.find(line) == -1:
+        return False
+    if buf.find(b"\n" + line + b"\n") != -1 or buf.find(b"\n" + line + b"\r\n") != -1:
+        return True
+    pattern = b"(?m)^" + _LINE_PADDING + re.escape(line) + _LINE_PADDING + b"$"
+    return re.search(pattern, buf) is not None
+
+
+def _find_lines(buf: bytes, lines: List[bytes]) -> Set[bytes]:
+    """
+    Find which of several lines a buffer contains, in a single pass over
+    the buffer whatever the number of lines.
+
+    :param buf: The buffer to search.
+    :param lines: The stripped lines to look for.
+    :return: The subset of `lines` that is present.
+    """
+    return set(lines).intersection(line.strip() for line in buf.split(b"\n"))
+
+
+def _fill_results(queries: List[str], response: str) -> List[str]:
+    """
+    Answer every query with the same response, except empty queries,
+    which are always rejected.
+
+    :param queries: The query strings that were searched for.
+    :param response: The response for each non-empty query.
+    :return: The result of each query, in order.
+    """
+    return [response if query.strip() else ERROR_EMPTY_QUERY for query in queries]
+
+
 class FileSearchServer:
     def __init__(self, host: str = HOST, port: int = PORT) -> None:
         """
@@ -39,11 +164,21 @@ class FileSearchServer:
         self.port = port
         self.server_socket: Optional[socket.socket] = None
         self.ssl_context: Optional[ssl.SSLContext] = None
+        self._server: Optional[asyncio.base_events.Server] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._stop_event: Optional[asyncio.Event] = None  # Set by stop() to end serve_forever()
+        self._connections: Dict[asyncio.StreamWriter, "asyncio.Task[None]"] = {}  # Open client connections and their handlers, closed by stop()
+        # Runs searches, which may stat, read or scan the file, away from the event loop
+        self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=MAX_WORKERS)
         self.linuxpath: str = linuxpath  # Initialize linuxpath
         self.reread_on_query: bool = reread_on_query  # Initialize reread_on_query
         self.ssl_enabled: bool = SSL_ENABLED  # Initialize ssl_enabled
-        self.data: Optional[List[str]] = None   # Will hold the file content in memory if REREAD_ON_QUERY is False
-        self.file_mtime: Optional[float] = None  # To track file modification time
+        self._line_set: FrozenSet[bytes] = frozenset()  # Stripped lines of the file, for O(1) lookups
+        self._index_key: Optional[FileKey] = None  # File version the index was built from
+        self._contents: bytes = b""  # Raw contents of the file, if REREAD_ON_QUERY is True
+        self._contents_key: Optional[FileKey] = None  # File version the contents were read from
+        self._index_lock = threading.Lock()  # Serializes index rebuilds across threads
+        self.ready = threading.Event()  # Set once the server is accepting connections
 
     def setup_server(self) -> None:
         """Set up the server socket and SSL context if enabled."""
@@ -57,49 +192,149 @@ class FileSearchServer:
             self.ssl_context.load_cert_chain(
                 certfile="server.crt", keyfile="server.key"
             )
+            # Issue session tickets so reconnecting clients can resume their
+            # TLS session instead of repeating the full handshake
+            self.ssl_context.options &= ~ssl.OP_NO_TICKET
+            # Only negotiate AES-GCM, which runs on the CPU's AES instructions.
+            # This governs TLS 1.2; OpenSSL's TLS 1.3 suites, which Python
+            # cannot configure, already prefer AES-GCM.
+            self.ssl_context.minimum_version = ssl.TLSVersion.TLSv1_2
+            self.ssl_context.set_ciphers("ECDHE+AESGCM")
             logger.info("SSL enabled: Using SSL for secure connections")
         else:
             logger.info("SSL not enabled: Using plain TCP connections")
 
-    def handle_client(self, client_socket: socket.socket) -> None:
+    async def handle_client(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
         """Handle client connections."""
+        task = asyncio.current_task()
+        assert task is not None
+        self._connections[writer] = task
+        if logger.isEnabledFor(logging.INFO):
+            ssl_object = writer.get_extra_info("ssl_object")
+            logger.info(
+                "Connection from %s%s",
+                writer.get_extra_info("peername"),
+                " (TLS session resumed)"
+                if ssl_object and ssl_object.session_reused
+                else "",
+            )
         try:
-            if self.ssl_context:
-                with self.ssl_context.wrap_socket(
-                    client_socket, server_side=True
-                ) as ssl_socket:
-                    self.process_request(ssl_socket)
-            else:
-                self.process_request(client_socket)
+            await self.process_request(reader, writer)
         except ssl.SSLError as e:
             logger.error("SSL error: %s", e)
         except Exception as e:
             logger.error("Error handling client: %s", e)
         finally:
-            client_socket.close()
+            del self._connections[writer]
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except Exception:
+                pass  # The client may already have gone away
+
+    async def read_message(
+        self, reader: asyncio.StreamReader
+    ) -> Optional[Tuple[bytes, bool]]:
+        """
+        Read one framed message from the client.
 
-    def process_request(self, client_socket: socket.socket) -> None:
-        """Process a request from the client."""
+        :param reader: The stream to read from.
+        :return: The message payload and whether it is a batch header, or None if the client closed the connection.
+        :raises PayloadTooLargeError: If the payload is larger than BUFFER_SIZE.
+        """
+        try:
+            header = await reader.readexactly(HEADER_SIZE)
+            size, batch = decode_header(header)
+            if size > BUFFER_SIZE:
+                raise PayloadTooLargeError(size)
+            return await reader.readexactly(size), batch
+        except asyncio.IncompleteReadError:
+            return None
+
+    async def process_request(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        """Process requests from the client until it closes the connection."""
         try:
-            start_time = time.time()
-            data = client_socket.recv(BUFFER_SIZE).decode("utf-8")
-            logger.info("Received query: %s", data)
-
-            if len(data) > BUFFER_SIZE:
-                client_socket.sendall("ERROR: Payload too large".encode("utf-8"))
-                return
-
-            if not data.strip():
-                client_socket.sendall("ERROR: Empty query".encode("utf-8"))
-                return
-
-            response = self.process_query(data)
-            client_socket.sendall(response.encode("utf-8"))
-            execution_time = time.time() - start_time
-            logger.info("Processed request in %.2f seconds", execution_time)
+            while True:
+                message = await self.read_message(reader)
+                if message is None:
+                    return  # Client closed the connection
+                start_time = time.time()
+                payload, batch = message
+                data = payload.decode("utf-8")
+                logger.info("Received query: %s", data)
+
+                if batch:
+                    response = await self.process_batch_request(data, reader)
+                elif not data.strip():
+                    response = ERROR_EMPTY_QUERY  # No need to search the file
+                else:
+                    response = await self._run_in_executor(self.process_query, data)
+                framed = FRAMED_RESPONSES.get(response)
+                if framed is None:  # Batch responses vary, so they are framed here
+                    framed = encode_message(response.encode("utf-8"))
+                writer.write(framed)
+                await writer.drain()
+                execution_time = time.time() - start_time
+                logger.info("Processed request in %.2f seconds", execution_time)
+        except PayloadTooLargeError:
+            # The payload is left unread, so the connection cannot be reused
+            writer.write(FRAMED_RESPONSES[ERROR_PAYLOAD_TOO_LARGE])
+            await writer.drain()
+        except InvalidBatchError:
+            # The batch's queries are left unread, so the connection cannot be reused
+            writer.write(FRAMED_RESPONSES[ERROR_INVALID_BATCH])
+            await writer.drain()
+        except (ConnectionError, ssl.SSLError):
+            raise  # The connection is unusable, let handle_client log it
         except Exception as e:
             logger.error("Error processing request: %s", e)
-            client_socket.sendall("ERROR: Internal server error".encode("utf-8"))
+            writer.write(FRAMED_RESPONSES[ERROR_INTERNAL])
+            await writer.drain()
+
+    async def process_batch_request(
+        self, header: str, reader: asyncio.StreamReader
+    ) -> str:
+        """
+        Read the queries of a batch request and answer them together.
+
+        A batch is a header message, flagged as such in its frame header and
+        holding the query count n, followed by n query messages. The
+        response is a single message holding a "BATCH <n>" line followed by
+        one result line per query, in order.
+
+        :param header: The payload of the batch header message.
+        :param reader: The stream to read the queries from.
+        :return: The batch response.
+        :raises InvalidBatchError: If the query count is missing or above MAX_BATCH, or a query is flagged as a batch header.
+        """
+        try:
+            count = int(header)
+        except ValueError:
+            raise InvalidBatchError(header)
+        if not 0 <= count <= MAX_BATCH:
+            raise InvalidBatchError(header)
+
+        queries = []
+        for _ in range(count):
+            message = await self.read_message(reader)
+            if message is None:
+                raise ConnectionError("Connection closed during batch")
+            payload, nested = message
+            if nested:
+                raise InvalidBatchError(header)
+            queries.append(payload.decode("utf-8"))
+        results = await self._run_in_executor(self.process_batch, queries)
+        return "\n".join([f"BATCH {count}"] + results)
+
+    async def _run_in_executor(self, func: Callable[..., R], *args: Any) -> R:
+        """Run a blocking search on the worker pool so the event loop keeps serving."""
+        return await asyncio.get_running_loop().run_in_executor(
+            self._executor, func, *args
+        )
 
     def process_query(self, query: str) -> str:
         """
@@ -108,60 +343,143 @@ class FileSearchServer:
         :param query: The query string to search for in the file.
         :return: The result of the search.
         """
+        return self.process_batch([query])[0]
+
+    def process_batch(self, queries: List[str]) -> List[str]:
+        """
+        Process several search queries against one snapshot of the file.
+
+        :param queries: The query strings to search for in the file.
+        :return: The result of each search, in order.
+        """
         try:
-            if self.reread_on_query:
-                logger.info("Re-reading file for each query")
-                with open(self.linuxpath, "r") as file:
-                    data = file.readlines()
+            # Lines are compared as bytes, so each query is encoded once
+            encoded = [query.strip().encode("utf-8") for query in queries]
+            # Empty queries are rejected without being searched for, and
+            # without touching the file if there is nothing else to search
+            searched = [q for q in encoded if q]
+            if not searched:
+                present: AbstractSet[bytes] = frozenset()
+            elif self.reread_on_query:
+                data = self._load_contents()
+                if len(searched) >= SINGLE_PASS_MIN_QUERIES:
+                    present = _find_lines(data, searched)
+                else:
+                    present = {q for q in searched if _contains_line(data, q)}
             else:
-                # If REREAD_ON_QUERY is False, cache the file data in memory
-                current_mtime = self.get_file_mtime(self.linuxpath)
-                if self.data is None or self.file_mtime != current_mtime:
-                    logger.info("Loading data into memory or file changed")
-                    with open(self.linuxpath, "r") as file:
-                        self.data = file.readlines()
-                    self.file_mtime = current_mtime
-                data = self.data
-
-            query = query.strip()
-            results = [line.strip() for line in data if query == line.strip()]
-
-            return "STRING EXISTS" if results else "STRING NOT FOUND"
+                present = self._load_index().intersection(searched)
+            return [
+                (STRING_EXISTS if q in present else STRING_NOT_FOUND)
+                if q
+                else ERROR_EMPTY_QUERY
+                for q in encoded
+            ]
         except FileNotFoundError:
             logger.error("File not found: %s", self.linuxpath)
-            return "STRING NOT FOUND"
+            return _fill_results(queries, STRING_NOT_FOUND)
         except Exception as e:
             logger.error("Error processing query: %s", e)
-            return "ERROR: Internal server error"
+            return _fill_results(queries, ERROR_INTERNAL)
 
-    def get_file_mtime(self, filepath: str) -> float:
-        """Get the last modification time of the file."""
-        try:
-            return os.path.getmtime(filepath)
-        except Exception as e:
-            logger.error("Error getting file modification time: %s", e)
-            return 0.0
+    def _load_index(self) -> FrozenSet[bytes]:
+        """
+        Return the set of stripped lines of the file, rebuilding it only when
+        the file has changed (see _file_key).
+
+        The lines are kept as raw bytes, which are smaller than str and
+        spare decoding the whole file.
+
+        :return: A frozenset containing every stripped line of the file.
+        """
+        key = _file_key(self.linuxpath)
+        if self._index_key == key:
+            return self._line_set
+
+        with self._index_lock:
+            # Another thread may have rebuilt the index while we waited
+            if self._index_key != key:
+                logger.info("Loading data into memory or file changed")
+                with open(self.linuxpath, "rb") as file:
+                    raw = file.read()
+                self._line_set = frozenset(line.strip() for line in raw.split(b"\n"))
+                self._index_key = key
+            return self._line_set
+
+    def _load_contents(self) -> bytes:
+        """
+        Return the raw contents of the file.
+
+        Queries are answered by scanning the contents with a single C-level
+        search. The file is only read again when it changes (see
+        _file_key). It is read into an immutable bytes object rather than
+        memory-mapped: a mapping of a file that is then truncated or
+        rewritten in place raises SIGBUS on access, and scans on other
+        threads may still be using the previous contents.
+
+        :return: The contents of the file.
+        """
+        key = _file_key(self.linuxpath)
+        if self._contents_key != key:
+            with self._index_lock:
+                if self._contents_key != key:
+                    logger.info("Re-reading file: %s", self.linuxpath)
+                    with open(self.linuxpath, "rb") as file:
+                        self._contents = file.read()
+                    self._contents_key = key
+        return self._contents
+
+    async def serve_forever(self) -> None:
+        """Accept and serve clients on the event loop until stop() is called."""
+        assert self.server_socket is not None
+        self._loop = asyncio.get_running_loop()
+        # TLS handshakes run in each connection's own task, so a slow client
+        # never holds up the accept loop. asyncio also sets TCP_NODELAY on
+        # every accepted connection.
+        self._server = await asyncio.start_server(
+            self.handle_client, sock=self.server_socket, ssl=self.ssl_context
+        )
+        self._stop_event = asyncio.Event()
+        self.ready.set()
+        async with self._server:
+            try:
+                await self._stop_event.wait()
+            finally:
+                # Runs both after stop() and when the task is cancelled, as
+                # asyncio.run does on Ctrl-C. The open connections are
+                # aborted first, since their handlers would otherwise stay
+                # blocked reading from idle keep-alive clients, and the
+                # handlers are let finish rather than have asyncio.run
+                # cancel them.
+                self._close()
+                if self._connections:
+                    await asyncio.wait(list(self._connections.values()))
+                logger.info("Server stopped")
+                self._executor.shutdown(wait=False)
 
     def start(self) -> None:
         """Start the server and handle clients."""
         self.setup_server()
-        while True:
-            try:
-                if (
-                    self.server_socket is not None
-                ):  # Add a check to ensure server_socket is not None
-                    client_socket, client_address = self.server_socket.accept()
-                    logger.info("Connection from %s", client_address)   
-                    client_thread = threading.Thread(
-                        target=self.handle_client, args=(client_socket,)
-                    )
-                    client_thread.start()
-                else:
-                    logger.error("Server socket is not initialized.")
-                    break
-            except Exception as e:
-                logger.error("Error accepting connections: %s", e)
-                break
+        try:
+            asyncio.run(self.serve_forever())
+        except Exception as e:
+            logger.error("Error serving connections: %s", e)
+
+    def stop(self) -> None:
+        """Stop a running server. Safe to call from any thread."""
+        if self._loop is not None and self._stop_event is not None:
+            self._loop.call_soon_threadsafe(self._stop_event.set)
+
+    def _close(self) -> None:
+        """Stop accepting connections and close every open client connection."""
+        assert self._server is not None
+        self._server.close()
+        # Idle keep-alive clients would otherwise hold the server open until
+        # they disconnect, and their handlers would then be cancelled. The
+        # connections are aborted rather than closed, since a TLS close
+        # waits for each client to answer the shutdown alert.
+        for writer in list(self._connections):
+            writer.transport.abort()
+
 
 if __name__ == "__main__":
     server = FileSearchServer()
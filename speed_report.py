@@ -1,78 +1,152 @@
+import argparse
+import matplotlib
 import matplotlib.pyplot as plt
-from typing import Dict, List, Tuple
+import numpy as np
+import pandas as pd
+from matplotlib.axes import Axes
+from matplotlib.figure import Figure
+from typing import Dict, Optional
 
+# Per-algorithm results, held as parallel "size", "time" and (optionally) "reread" arrays
+BenchmarkResults = Dict[str, Dict[str, np.ndarray]]
 
-def parse_benchmark_results(file_path: str) -> Dict[str, List[Tuple[int, float, bool]]]:
+
+def has_reread_column(file_path: str) -> bool:
     """
-    Parse benchmark results from a file.
+    Check whether a benchmark results file has a column with the REREAD_ON_QUERY flag of each run.
+
+    The current benchmark writes this fourth "Reread" column; older result files only have three columns.
 
     Args:
         file_path: Path to the benchmark results file.
 
     Returns:
-        A dictionary where keys are algorithm names and values are lists of tuples (file_size, execution_time).
+        True if the header line names a Reread column.
     """
     with open(file_path, "r") as f:
-        lines = f.readlines()
+        return "Reread" in f.readline().split()
 
-    lines = lines[1:]  # Skip the header line
 
-    results: Dict[str, List[Tuple[int, float, bool]]] = {}
+def parse_benchmark_results(file_path: str) -> BenchmarkResults:
+    """
+    Parse benchmark results from a file, with or without a reread column.
 
-    for line in lines:
-        parts = line.strip().split()
-        if len(parts) == 4:
-            algorithm = parts[0]
-            size = int(parts[1])
-            time = float(parts[2])
-            reread = parts[3] == "1"
+    Args:
+        file_path: Path to the benchmark results file.
 
-            if algorithm not in results:
-                results[algorithm] = []
-            results[algorithm].append((size, time, reread))
+    Returns:
+        A dictionary where keys are algorithm names and values map "size", "time" and, if the file
+        has the column, "reread" to parallel arrays of file sizes (int64), execution times (float64)
+        and reread flags (bool), ordered by file size and then execution time.
+    """
+    # The header, not the caller, decides how many columns each row must have
+    has_reread = has_reread_column(file_path)
+    columns = ["algorithm", "size", "time", "reread"] if has_reread else ["algorithm", "size", "time"]
+    # The C parser splits on whitespace and converts the columns in bulk,
+    # reading straight from a memory map of the file rather than a copy of
+    # it; rows with missing fields are dropped, as are rows with extra fields
+    df = pd.read_csv(
+        file_path,
+        sep=r"\s+",
+        skiprows=1,  # Skip the header line
+        names=columns,
+        index_col=False,  # Never take an extra leading field as the index
+        engine="c",
+        memory_map=True,
+        on_bad_lines="skip",
+        # Fixed dtypes skip per-column type inference; the numeric columns
+        # are read as floats so that missing fields can still become NaN
+        dtype={"algorithm": str, "size": "float64", "time": "float64", "reread": "float64"},
+    ).dropna()
+    # Convert each column once for the whole file rather than per algorithm
+    df = df.assign(size=df["size"].astype("int64"))
+    if has_reread:
+        df = df.assign(reread=df["reread"] == 1)
+
+    results: BenchmarkResults = {}
+
+    for algorithm, group in df.groupby("algorithm", sort=False):
+        # Sort once here so that each plot_results call can use the arrays as-is
+        group = group.sort_values(["size", "time"], kind="stable")
+        results[str(algorithm)] = {
+            column: group[column].to_numpy() for column in columns[1:]
+        }
 
     return results
 
 
 def plot_results(
-    results: Dict[str, List[Tuple[int, float, bool]]], reread: bool
+    results: BenchmarkResults, reread: Optional[bool], ax: Optional[Axes] = None
 ) -> None:
     """
-    Plot the benchmark results.
+    Plot the benchmark results and save the chart.
 
     Args:
-        results: A dictionary where keys are algorithm names and values are lists of tuples (file_size, execution_time).
-        reread: Boolean indicating whether to plot results for REREAD_ON_QUERY=True or False.
+        results: Per-algorithm arrays as returned by parse_benchmark_results.
+        reread: Boolean indicating whether to plot results for REREAD_ON_QUERY=True or False,
+            or None to plot every result, for files without a reread column.
+        ax: Axes to draw on, cleared first so that one figure can be reused across charts.
+            A new figure is created if omitted.
     """
-    plt.figure(figsize=(10, 6))
+    if ax is None:
+        _, ax = plt.subplots(figsize=(10, 6))
+    else:
+        ax.clear()
+
+    mode = "" if reread is None else f" ({'reread' if reread else 'no reread'})"
 
     for algorithm, data in results.items():
-        data = sorted(data)
-        relevant_data = [
-            (size, time) for size, time, reread_flag in data if reread_flag == reread
-        ]
-
-        if relevant_data:
-            sizes, times = zip(*relevant_data)
-            plt.plot(
+        # The arrays are already sorted; keep only the requested reread mode
+        mask = slice(None) if reread is None else data["reread"] == reread
+        sizes = data["size"][mask]
+
+        if sizes.size:
+            ax.plot(
                 sizes,
-                times,
-                marker="o" if reread else "x",
-                label=f"{algorithm} ({'reread' if reread else 'no reread'})",
+                data["time"][mask],
+                marker="x" if reread is False else "o",
+                label=f"{algorithm}{mode}",
             )
 
-    plt.xlabel("File Size")
-    plt.ylabel("Execution Time (s)")
-    plt.title(
-        f"Execution Time vs. File Size for Different Algorithms ({'reread' if reread else 'no reread'})"
-    )
-    plt.legend()
-    plt.grid(True)
-    plt.savefig(f"benchmark_chart_{'reread' if reread else 'no_reread'}.png")
-    plt.show()
+    ax.set_xlabel("File Size")
+    ax.set_ylabel("Execution Time (s)")
+    ax.set_title(f"Execution Time vs. File Size for Different Algorithms{mode}")
+    ax.legend()
+    ax.grid(True)
+    suffix = "" if reread is None else f"_{'reread' if reread else 'no_reread'}"
+    figure = ax.figure
+    assert isinstance(figure, Figure)
+    figure.savefig(f"benchmark_chart{suffix}.png")
 
 
 if __name__ == "__main__":
-    benchmark_results = parse_benchmark_results("benchmark_results.txt")
-    plot_results(benchmark_results, reread=True)
-    plot_results(benchmark_results, reread=False)
+    parser = argparse.ArgumentParser(description="Plot the benchmark results.")
+    parser.add_argument(
+        "results_file",
+        nargs="?",
+        default="benchmark_results.txt",
+        help="Benchmark results file to plot (default: benchmark_results.txt).",
+    )
+    parser.add_argument(
+        "--show",
+        action="store_true",
+        help="Display the charts in windows after saving them.",
+    )
+    args = parser.parse_args()
+    if not args.show:
+        # Only write the PNG files, without starting a GUI backend
+        matplotlib.use("Agg")
+
+    benchmark_results = parse_benchmark_results(args.results_file)
+    # Files without a reread column are plotted into a single chart
+    modes = [True, False] if has_reread_column(args.results_file) else [None]
+    if args.show:
+        # Each chart needs its own figure to stay on screen
+        for reread in modes:
+            plot_results(benchmark_results, reread)
+        plt.show()
+    else:
+        fig, ax = plt.subplots(figsize=(10, 6))
+        for reread in modes:
+            plot_results(benchmark_results, reread, ax=ax)
+        plt.close(fig)
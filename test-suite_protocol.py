@@ -0,0 +1,204 @@
+import asyncio
+import os
+import pytest
+import socket
+import threading
+import tracemalloc
+import server as server_module
+from typing import Generator, List
+from server import (
+    BUFFER_SIZE,
+    ERROR_EMPTY_QUERY,
+    STRING_EXISTS,
+    STRING_NOT_FOUND,
+    FileSearchServer,
+    PayloadTooLargeError,
+)
+from protocol import PREALLOCATE_LIMIT, encode_message, recv_message
+
+# These tests call the server's search and framing code directly, without
+# a listening socket or TLS; test-suite_server.py covers the network path.
+
+
+@pytest.fixture(params=[True, False], ids=["reread", "cached"])
+def server(request, tmp_path) -> Generator[FileSearchServer, None, None]:
+    """Fixture to create an unstarted server over a mock file, in both REREAD_ON_QUERY modes."""
+    test_file = tmp_path / "mock_file.txt"
+    test_file.write_text("teststring\nexample\nanotherline\n")
+
+    server = FileSearchServer(host="localhost", port=0)
+    server.linuxpath = str(test_file)
+    server.reread_on_query = request.param
+    yield server
+
+
+def test_string_exists(server: FileSearchServer) -> None:
+    """Test a query that matches a line of the file."""
+    assert server.process_query("teststring\n") == STRING_EXISTS
+
+
+def test_string_not_found(server: FileSearchServer) -> None:
+    """Test queries that do not match a whole line of the file."""
+    assert server.process_query("1234abcd") == STRING_NOT_FOUND
+    assert server.process_query("test") == STRING_NOT_FOUND
+
+
+def test_empty_query(server: FileSearchServer) -> None:
+    """Test that an empty query is rejected."""
+    assert server.process_query("\n") == ERROR_EMPTY_QUERY
+
+
+def test_empty_query_not_searched(
+    server: FileSearchServer, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Test that empty queries are rejected without loading or searching the file."""
+    assert server.process_batch(["", " "]) == [ERROR_EMPTY_QUERY] * 2
+    assert server._index_key is None and server._contents_key is None
+
+    searched: List[bytes] = []
+    contains_line = server_module._contains_line
+
+    def spy_contains_line(buf: bytes, line: bytes) -> bool:
+        searched.append(line)
+        return contains_line(buf, line)
+
+    monkeypatch.setattr(server_module, "_contains_line", spy_contains_line)
+    assert server.process_batch(["", "teststring"]) == [ERROR_EMPTY_QUERY, STRING_EXISTS]
+    assert b"" not in searched
+
+
+def test_crlf_line_endings(server: FileSearchServer, tmp_path) -> None:
+    """Test matching lines of a file with Windows line endings."""
+    crlf_file = tmp_path / "crlf_file.txt"
+    crlf_file.write_bytes(b"teststring\r\nexample\r\n")
+    server.linuxpath = str(crlf_file)
+    assert server.process_query("example") == STRING_EXISTS
+
+
+def test_mixed_line_endings(server: FileSearchServer, tmp_path) -> None:
+    """Test matching lines of a file that mixes LF and CRLF line endings."""
+    mixed_file = tmp_path / "mixed_file.txt"
+    mixed_file.write_bytes(b"a\nb\r\nc\r\n")
+    server.linuxpath = str(mixed_file)
+    assert [server.process_query(query) for query in ("a", "b", "c")] == [STRING_EXISTS] * 3
+
+
+def test_surrounding_whitespace(server: FileSearchServer, tmp_path) -> None:
+    """Test that lines match with their surrounding whitespace stripped."""
+    padded_file = tmp_path / "padded_file.txt"
+    padded_file.write_bytes(b"foo  \n bar\nbaz\n")
+    server.linuxpath = str(padded_file)
+    assert [server.process_query(query) for query in ("foo", "bar", "baz")] == [STRING_EXISTS] * 3
+    assert server.process_query("oo") == STRING_NOT_FOUND
+
+
+def test_query_spanning_lines(server: FileSearchServer) -> None:
+    """Test that a query with an embedded newline never matches across lines."""
+    assert server.process_query("teststring\nexample") == STRING_NOT_FOUND
+    assert server.process_batch(["teststring\nexample"] * 8) == [STRING_NOT_FOUND] * 8
+
+
+def test_file_not_found(server: FileSearchServer) -> None:
+    """Test that queries against a missing file are not found."""
+    server.linuxpath = "/path/to/non_existent_file.txt"
+    assert server.process_query("teststring") == STRING_NOT_FOUND
+
+
+def test_empty_query_file_not_found(server: FileSearchServer) -> None:
+    """Test that an empty query is rejected even when the file is missing."""
+    server.linuxpath = "/path/to/non_existent_file.txt"
+    assert server.process_query("") == ERROR_EMPTY_QUERY
+    assert server.process_batch(["teststring", " "]) == [STRING_NOT_FOUND, ERROR_EMPTY_QUERY]
+
+
+def test_file_modified(server: FileSearchServer, tmp_path) -> None:
+    """Test that a change to the file is picked up by the next query."""
+    assert server.process_query("newline") == STRING_NOT_FOUND
+    test_file = tmp_path / "mock_file.txt"
+    test_file.write_text("teststring\nnewline\n")
+    # Make sure the change is visible even on filesystems with coarse mtimes
+    stat = test_file.stat()
+    os.utime(test_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    assert server.process_query("newline") == STRING_EXISTS
+
+
+def test_file_modified_same_mtime(server: FileSearchServer, tmp_path) -> None:
+    """Test that a rewrite of the file that keeps its modification time is picked up."""
+    assert server.process_query("newline") == STRING_NOT_FOUND
+    test_file = tmp_path / "mock_file.txt"
+    stat = test_file.stat()
+    test_file.write_text("teststring\nnewline\n")
+    os.utime(test_file, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+    assert server.process_query("newline") == STRING_EXISTS
+
+
+def test_batch(server: FileSearchServer) -> None:
+    """Test a batch large enough to be answered in a single pass over the file."""
+    queries = ["teststring", "1234abcd", "", "anotherline"] * 3
+    expected = [STRING_EXISTS, STRING_NOT_FOUND, ERROR_EMPTY_QUERY, STRING_EXISTS] * 3
+    assert server.process_batch(queries) == expected
+
+
+def test_read_message() -> None:
+    """Test reading consecutive framed messages from a stream."""
+    server = FileSearchServer(host="localhost", port=0)
+
+    async def read_all() -> list:
+        reader = asyncio.StreamReader()
+        reader.feed_data(encode_message(b"1", batch=True) + encode_message(b"example"))
+        reader.feed_eof()
+        return [await server.read_message(reader) for _ in range(3)]
+
+    assert asyncio.run(read_all()) == [(b"1", True), (b"example", False), None]
+
+
+def test_read_message_too_large() -> None:
+    """Test that a payload larger than the server's buffer size is rejected."""
+    server = FileSearchServer(host="localhost", port=0)
+
+    async def read_one() -> None:
+        reader = asyncio.StreamReader()
+        reader.feed_data(encode_message(b"B" * (BUFFER_SIZE + 1)))
+        await server.read_message(reader)
+
+    with pytest.raises(PayloadTooLargeError):
+        asyncio.run(read_one())
+
+
+def test_recv_message_short_reads() -> None:
+    """Test receiving a message that arrives a few bytes at a time."""
+    sender, receiver = socket.socketpair()
+    data = encode_message(b"teststring")
+
+    def send_slowly() -> None:
+        for i in range(0, len(data), 3):
+            sender.sendall(data[i : i + 3])
+        sender.close()
+
+    thread = threading.Thread(target=send_slowly)
+    thread.start()
+    try:
+        assert recv_message(receiver) == b"teststring"
+        assert recv_message(receiver) is None
+    finally:
+        thread.join()
+        receiver.close()
+
+
+def test_recv_message_unframed_reply() -> None:
+    """Test that an unframed reply, read as a huge length, is not preallocated."""
+    sender, receiver = socket.socketpair()
+    # "STRI" decodes to a length of about 1.4 GB
+    sender.sendall(b"STRING NOT FOUND")
+    sender.close()
+    tracemalloc.start()
+    try:
+        assert recv_message(receiver) is None
+        assert tracemalloc.get_traced_memory()[1] < 2 * PREALLOCATE_LIMIT
+    finally:
+        tracemalloc.stop()
+        receiver.close()
+
+
+if __name__ == "__main__":
+    pytest.main()
@@ -1,10 +1,23 @@
+import asyncio
+import contextlib
 import pytest
 import socket
 import threading
 import ssl
 import time
-from typing import Generator
-from server import FileSearchServer
+from typing import Generator, Iterator, List, Optional, Tuple
+from server import BUFFER_SIZE, MAX_BATCH, FileSearchServer
+from client import ClientSocket, FileSearchClient
+from protocol import ERROR_INTERNAL, HEADER_SIZE, decode_header, encode_message, recv_message
+
+# Client-side SSL context shared by every test; the server uses a self-signed certificate
+_SSL_CTX = ssl.create_default_context(ssl.Purpose.SERVER_AUTH)
+_SSL_CTX.check_hostname = False
+_SSL_CTX.verify_mode = ssl.CERT_NONE
+_ssl_session: Optional[ssl.SSLSession] = None  # Most recent resumable session
+
+# Query one byte larger than the server's buffer size
+_LARGE_PAYLOAD = b"B" * (BUFFER_SIZE + 1)
 
 
 # Mock configurations for testing environment
@@ -19,10 +32,12 @@ class MockConfig:
         self.port = 0  # 0 means the OS will select an available port
 
 
-@pytest.fixture
-def server(tmp_path) -> Generator[FileSearchServer, None, None]:
-    """Fixture to set up and tear down the server for testing."""
-    test_file = tmp_path / "mock_file.txt"
+@pytest.fixture(scope="module")
+def running_server(
+    tmp_path_factory: pytest.TempPathFactory,
+) -> Generator[Tuple[FileSearchServer, MockConfig], None, None]:
+    """Fixture to start one server for the whole module and shut it down afterwards."""
+    test_file = tmp_path_factory.mktemp("server") / "mock_file.txt"
     test_file.write_text("teststring\nexample\nanotherline\n")
 
     config = MockConfig(path=str(test_file))
@@ -36,142 +51,338 @@ def server(tmp_path) -> Generator[FileSearchServer, None, None]:
     server_thread = threading.Thread(target=server.start, daemon=True)
     server_thread.start()
 
-    # Allow time for server to start
-    time.sleep(1)
+    # Wait until the server is accepting connections
+    assert server.ready.wait(timeout=5)
 
     # Set the server port to the assigned port
     assert server.server_socket is not None
     config.port = server.server_socket.getsockname()[1]
 
-    yield server
+    yield server, config
 
     # Properly close and shutdown the server
-    server.server_socket.close()
+    server.stop()
     server_thread.join(timeout=5)  # Allow time for the server thread to exit
 
 
 @pytest.fixture
-def client(server: FileSearchServer) -> Generator[socket.socket, None, None]:
-    """Fixture to set up and tear down the client for testing."""
-    client_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-    assert server.server_socket is not None
-    client_socket.connect(server.server_socket.getsockname())
-    yield client_socket
-    client_socket.close()
-
-
-def ssl_wrap_socket(sock: socket.socket) -> ssl.SSLSocket:
-    """Wrap the socket with SSL."""
-    context = ssl.create_default_context(ssl.Purpose.SERVER_AUTH)
-    context.check_hostname = False
-    context.verify_mode = ssl.CERT_NONE
-    return context.wrap_socket(sock, server_hostname="localhost")
-
+def server(
+    running_server: Tuple[FileSearchServer, MockConfig]
+) -> Generator[FileSearchServer, None, None]:
+    """Fixture to hand each test the shared server with its settings reset."""
+    server, config = running_server
+    yield server
 
-def test_non_existent_query(server: FileSearchServer, client: socket.socket) -> None:
-    """Test sending a non-existent query to the server."""
-    try:
-        wrapped_client = ssl_wrap_socket(client)
-        wrapped_client.sendall(b"non_existent_query")
-        response = wrapped_client.recv(1024).decode("utf-8")
-        assert response.strip() == "STRING NOT FOUND"
-    except (ConnectionError, BrokenPipeError, ssl.SSLError) as e:
-        pytest.fail(f"SSL/Connection error occurred: {e}")
+    # Undo any changes the test made to the server's settings
+    server.linuxpath = config.linuxpath
+    server.reread_on_query = config.reread_on_query
 
 
-def test_string_not_found(server: FileSearchServer, client: socket.socket) -> None:
-    """Test sending a query that does not match any string in the file."""
+@pytest.fixture
+def client(server: FileSearchServer) -> Generator[ssl.SSLSocket, None, None]:
+    """Fixture to set up and tear down the client for testing."""
+    global _ssl_session
+    assert server.server_socket is not None
+    client_socket = socket.create_connection(server.server_socket.getsockname())
+    wrapped_client = ssl_wrap_socket(client_socket)
+    yield wrapped_client
+    # Keep the session so that the next test's connection can resume it
+    # instead of doing a full handshake
+    session = wrapped_client.session
+    if session is not None and session.has_ticket:
+        _ssl_session = session
+    wrapped_client.close()
+
+
+@contextlib.contextmanager
+def fail_on_connection_error() -> Iterator[None]:
+    """Turn connection and SSL errors raised in the block into test failures."""
     try:
-        wrapped_client = ssl_wrap_socket(client)
-        wrapped_client.sendall(b"1234abcd")
-        response = wrapped_client.recv(1024).decode("utf-8")
-        assert response.strip() == "STRING NOT FOUND"
-    except (ConnectionError, BrokenPipeError, ssl.SSLError) as e:
+        yield
+    except (ConnectionError, asyncio.IncompleteReadError, ssl.SSLError) as e:
         pytest.fail(f"SSL/Connection error occurred: {e}")
 
 
-def test_string_exists(server: FileSearchServer, client: socket.socket) -> None:
-    """Test sending a query that matches a string in the file."""
-    try:
-        wrapped_client = ssl_wrap_socket(client)
-        wrapped_client.sendall(b"teststring\n")
-        response = wrapped_client.recv(1024).decode("utf-8")
-        assert response.strip() == "STRING EXISTS"
-    except (ConnectionError, BrokenPipeError, ssl.SSLError) as e:
-        pytest.fail(f"SSL/Connection error occurred: {e}")
+def ssl_wrap_socket(sock: socket.socket) -> ssl.SSLSocket:
+    """Wrap the socket with SSL, resuming the last client's TLS session if there is one."""
+    return _SSL_CTX.wrap_socket(
+        sock, server_hostname="localhost", session=_ssl_session
+    )
 
 
-def test_file_not_found(server: FileSearchServer, client: socket.socket) -> None:
-    """Test server behavior when the file is not found."""
-    try:
-        server.linuxpath = "/path/to/non_existent_file.txt"
-        wrapped_client = ssl_wrap_socket(client)
-        wrapped_client.sendall(b"teststring")
-        response = wrapped_client.recv(1024).decode("utf-8")
-        assert response.strip() == "STRING NOT FOUND"
-    except (ConnectionError, BrokenPipeError, ssl.SSLError) as e:
-        pytest.fail(f"SSL/Connection error occurred: {e}")
+def test_multiple_queries_per_connection(
+    server: FileSearchServer, client: ssl.SSLSocket
+) -> None:
+    """Test sending several queries over one kept-alive connection."""
+    with fail_on_connection_error():
+        for query, expected in [
+            (b"teststring", "STRING EXISTS"),
+            (b"1234abcd", "STRING NOT FOUND"),
+            (b"example", "STRING EXISTS"),
+        ]:
+            client.sendall(encode_message(query))
+            payload = recv_message(client)
+            assert payload is not None
+            response = payload.decode("utf-8")
+            assert response.strip() == expected
+
+
+def test_batch_query(server: FileSearchServer, client: ssl.SSLSocket) -> None:
+    """Test answering several queries sent as one batch."""
+    with fail_on_connection_error():
+        client.sendall(
+            encode_message(b"3", batch=True)
+            + encode_message(b"teststring")
+            + encode_message(b"1234abcd")
+            + encode_message(b"anotherline")
+        )
+        payload = recv_message(client)
+        assert payload is not None
+        response = payload.decode("utf-8")
+        assert response.split("\n") == [
+            "BATCH 3",
+            "STRING EXISTS",
+            "STRING NOT FOUND",
+            "STRING EXISTS",
+        ]
+
+
+def test_tls_session_resumption(server: FileSearchServer) -> None:
+    """Test that a reconnecting client can resume its TLS session."""
+    assert server.server_socket is not None
+    address = server.server_socket.getsockname()
+    with fail_on_connection_error():
+        with _SSL_CTX.wrap_socket(
+            socket.create_connection(address), server_hostname="localhost"
+        ) as first:
+            first.sendall(encode_message(b"teststring"))
+            recv_message(first)  # TLS 1.3 tickets arrive after the handshake
+            session = first.session
+        with _SSL_CTX.wrap_socket(
+            socket.create_connection(address),
+            server_hostname="localhost",
+            session=session,
+        ) as second:
+            assert second.session_reused
 
 
 def test_client_disconnection_handling(
-    server: FileSearchServer, client: socket.socket
+    server: FileSearchServer, client: ssl.SSLSocket
 ) -> None:
     """Test the server's handling of a client disconnection."""
-    try:
-        wrapped_client = ssl_wrap_socket(client)
-        wrapped_client.sendall(b"teststring")
-        wrapped_client.close()
+    with fail_on_connection_error():
+        client.sendall(encode_message(b"teststring"))
+        client.close()
         time.sleep(1)  # Allow time for the server to handle disconnection
-    except (ConnectionError, BrokenPipeError, ssl.SSLError) as e:
-        pytest.fail(f"SSL/Connection error occurred: {e}")
 
 
 def test_multiple_concurrent_clients(server: FileSearchServer) -> None:
     """Test handling multiple concurrent clients."""
-    num_clients = 5
-    clients = []
+    num_clients = 50
+    assert server.server_socket is not None
+    host, port = server.server_socket.getsockname()
+
+    async def send_query() -> str:
+        """Helper coroutine to send a query from its own connection."""
+        reader, writer = await asyncio.open_connection(
+            host, port, ssl=_SSL_CTX, server_hostname="localhost"
+        )
+        try:
+            writer.write(encode_message(b"teststring"))
+            await writer.drain()
+            header = await reader.readexactly(HEADER_SIZE)
+            response = await reader.readexactly(decode_header(header)[0])
+            return response.decode("utf-8")
+        finally:
+            writer.close()
+            await writer.wait_closed()
+
+    async def send_queries() -> List[str]:
+        return await asyncio.gather(*(send_query() for _ in range(num_clients)))
+
+    with fail_on_connection_error():
+        responses = asyncio.run(send_queries())
+    assert [response.strip() for response in responses] == ["STRING EXISTS"] * num_clients
+
+
+def test_payload_too_large(
+    server: FileSearchServer, client: ssl.SSLSocket
+) -> None:
+    """Test that a query larger than the server's buffer size is rejected."""
+    with fail_on_connection_error():
+        client.sendall(encode_message(_LARGE_PAYLOAD))
+        payload = recv_message(client)
+        assert payload is not None
+        response = payload.decode("utf-8")
+        assert response.strip() == "ERROR: Payload too large"
 
-    def send_query(client_socket: socket.socket) -> None:
-        """Helper function to send a query from a client socket."""
-        wrapped_client = ssl_wrap_socket(client_socket)
-        wrapped_client.sendall(b"19;0;1;28;0;7;4;0;\n")
-        response = wrapped_client.recv(1024).decode("utf-8")
-        assert response.strip() == "STRING EXISTS"
 
+def test_stop_with_open_connections(tmp_path, caplog: pytest.LogCaptureFixture) -> None:
+    """Test that stop() shuts the server down while a keep-alive client is still connected."""
+    test_file = tmp_path / "mock_file.txt"
+    test_file.write_text("teststring\n")
+    server = FileSearchServer(host="localhost", port=0)
+    server.linuxpath = str(test_file)
+    server_thread = threading.Thread(target=server.start, daemon=True)
+    server_thread.start()
+    assert server.ready.wait(timeout=5)
+    assert server.server_socket is not None
+
+    search_client = FileSearchClient(
+        host="localhost", port=server.server_socket.getsockname()[1], ssl_enabled=True
+    )
+    search_client.setup_ssl()
     try:
-        for _ in range(num_clients):
-            client_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            assert server.server_socket is not None
-            client_socket.connect(server.server_socket.getsockname())
-            clients.append(client_socket)
-
-        threads = []
-        for client_socket in clients:
-            thread = threading.Thread(target=send_query, args=(client_socket,))
-            threads.append(thread)
-            thread.start()
+        assert search_client.send_query("teststring") == "STRING EXISTS"
+        server.stop()
+        server_thread.join(timeout=5)
+        assert not server_thread.is_alive()
+    finally:
+        search_client.close()
+    assert not [r for r in caplog.records if r.exc_info is not None]
 
-        for thread in threads:
-            thread.join()
-    except (ConnectionError, BrokenPipeError, ssl.SSLError) as e:
-        pytest.fail(f"SSL/Connection error occurred: {e}")
+
+def test_cancel_with_open_connections(tmp_path) -> None:
+    """Test that cancelling serve_forever(), as Ctrl-C does, ends it while a keep-alive client is connected."""
+    test_file = tmp_path / "mock_file.txt"
+    test_file.write_text("teststring\n")
+    server = FileSearchServer(host="localhost", port=0)
+    server.linuxpath = str(test_file)
+    server.setup_server()
+    assert server.server_socket is not None
+
+    loop = asyncio.new_event_loop()
+    task = loop.create_task(server.serve_forever())
+
+    def run() -> None:
+        with contextlib.suppress(asyncio.CancelledError):
+            loop.run_until_complete(task)
+
+    server_thread = threading.Thread(target=run, daemon=True)
+    server_thread.start()
+    assert server.ready.wait(timeout=5)
+
+    search_client = FileSearchClient(
+        host="localhost", port=server.server_socket.getsockname()[1], ssl_enabled=True
+    )
+    search_client.setup_ssl()
+    try:
+        assert search_client.send_query("teststring") == "STRING EXISTS"
+        loop.call_soon_threadsafe(task.cancel)
+        server_thread.join(timeout=5)
+        assert not server_thread.is_alive()
+        assert task.cancelled()
     finally:
-        for client_socket in clients:
-            client_socket.close()
+        search_client.close()
+    loop.close()
+
 
+@pytest.fixture
+def search_client(server: FileSearchServer) -> Generator[FileSearchClient, None, None]:
+    """Fixture to set up and tear down a pooling FileSearchClient for testing."""
+    assert server.server_socket is not None
+    host, port = server.server_socket.getsockname()
+    search_client = FileSearchClient(host=host, port=port, ssl_enabled=True)
+    search_client.setup_ssl()
+    yield search_client
+    search_client.close()
 
-def test_query_timeout_handling(
-    server: FileSearchServer, client: socket.socket
+
+def test_client_reuses_connection(search_client: FileSearchClient) -> None:
+    """Test that the client sends consecutive queries over one pooled connection."""
+    assert search_client.send_query("teststring") == "STRING EXISTS"
+    pooled = list(search_client._pool.queue)
+    assert search_client.send_query("1234abcd") == "STRING NOT FOUND"
+    assert len(pooled) == 1
+    assert list(search_client._pool.queue) == pooled
+
+
+def test_client_connection_limit(
+    server: FileSearchServer, monkeypatch: pytest.MonkeyPatch
 ) -> None:
-    """Test handling a query that triggers a timeout."""
+    """Test that concurrent queries never open more connections than the client allows."""
+    assert server.server_socket is not None
+    host, port = server.server_socket.getsockname()
+    search_client = FileSearchClient(
+        host=host, port=port, ssl_enabled=True, max_connections=2
+    )
+    search_client.setup_ssl()
+    connect = search_client._connect
+    opened: List[ClientSocket] = []
+
+    def counting_connect() -> ClientSocket:
+        opened.append(connect())
+        return opened[-1]
+
+    monkeypatch.setattr(search_client, "_connect", counting_connect)
+    responses: List[str] = []
+
+    def send_queries() -> None:
+        for _ in range(5):
+            responses.append(search_client.send_query("teststring"))
+
+    threads = [threading.Thread(target=send_queries) for _ in range(8)]
     try:
-        wrapped_client = ssl_wrap_socket(client)
-        # Large query to cause timeout
-        wrapped_client.sendall(b"B" * (1024 + 1))
-        response = wrapped_client.recv(1024).decode("utf-8")
-        assert response.strip() == "STRING NOT FOUND"
-    except (ConnectionError, BrokenPipeError, ssl.SSLError) as e:
-        pytest.fail(f"SSL/Connection error occurred: {e}")
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(timeout=10)
+        assert responses == ["STRING EXISTS"] * 40
+        assert len(opened) == 2
+    finally:
+        search_client.close()
+
+
+def test_client_retries_dropped_connection(search_client: FileSearchClient) -> None:
+    """Test that the client reconnects when the server has dropped its pooled connection."""
+    assert search_client.send_query("teststring") == "STRING EXISTS"
+    pooled = search_client._pool.queue[0]
+    # Make the server close the pooled connection behind the client's back
+    pooled.sendall(encode_message(_LARGE_PAYLOAD))
+    payload = recv_message(pooled)
+    assert payload is not None
+    assert payload.decode("utf-8") == "ERROR: Payload too large"
+    assert search_client.send_query("example") == "STRING EXISTS"
+    assert search_client._pool.queue[0] is not pooled
+
+
+def test_client_batch(search_client: FileSearchClient) -> None:
+    """Test sending several queries in one batch through the client."""
+    assert search_client.send_batch(["teststring", "1234abcd", "anotherline"]) == [
+        "STRING EXISTS",
+        "STRING NOT FOUND",
+        "STRING EXISTS",
+    ]
+
+
+def test_client_query_resembling_batch_header(search_client: FileSearchClient) -> None:
+    """Test that a query's text is never taken for a batch header."""
+    assert search_client.send_query("BATCH\n2") == "STRING NOT FOUND"
+    assert search_client.send_query("BATCH\n1x") == "STRING NOT FOUND"
+    assert search_client.send_query("teststring") == "STRING EXISTS"
+
+
+def test_client_batch_rejected(search_client: FileSearchClient) -> None:
+    """Test that a rejected batch is reported for every query and its connection discarded."""
+    queries = ["teststring"] * (MAX_BATCH + 1)
+    assert search_client.send_batch(queries) == ["ERROR: Invalid batch"] * len(queries)
+    assert search_client._pool.empty()
+    assert search_client.send_query("teststring") == "STRING EXISTS"
+
+
+def test_client_internal_error(
+    server: FileSearchServer, search_client: FileSearchClient, tmp_path
+) -> None:
+    """Test that the client does not reuse a connection answered with an internal error."""
+    server.linuxpath = str(tmp_path)  # A directory cannot be read as the file
+    assert search_client.send_query("teststring") == ERROR_INTERNAL
+    assert search_client._pool.empty()
+
+
+def test_client_payload_too_large(search_client: FileSearchClient) -> None:
+    """Test that the client discards the connection the server closed after an oversized query."""
+    assert search_client.send_query(_LARGE_PAYLOAD.decode("utf-8")) == "ERROR: Payload too large"
+    assert search_client._pool.empty()
 
 
 if __name__ == "__main__":